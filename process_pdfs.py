@@ -5,15 +5,32 @@ Using PyMuPDF for high-performance PDF extraction and analysis
 """
 
 import fitz  # PyMuPDF
-import json
+import numpy as np
+import orjson
 import os
 import sys
 import time
+import multiprocessing as mp
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import gc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import re
+import string
+
+# Character classes for language detection
+_LATIN_RE = re.compile(r'[a-zA-Z]')
+_SCRIPT_RE = re.compile(r'[a-zA-Z\u00C0-\u017F\u0400-\u04FF\u4E00-\u9FFF]')
+
+# Default dict extraction minus image blocks, which embed each image's raw bytes;
+# images are reported separately via get_image_info
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+def _pdfdate(date_str):
+    """Format a PDF date (D:YYYYMMDDHHmmSSOHH'mm') as 'YYYY-MM-DD HH:MM:SS'"""
+    if not date_str or not date_str.startswith('D:') or len(date_str) < 16:
+        return date_str or ""
+    d = date_str[2:16]  # Extract YYYYMMDDHHMMSS part
+    return f"{d[:4]}-{d[4:6]}-{d[6:8]} {d[8:10]}:{d[10:12]}:{d[12:14]}"
 
 class OptimizedPDFProcessor:
     def __init__(self, input_dir="/app/input", output_dir="/app/output"):
@@ -25,176 +42,167 @@ class OptimizedPDFProcessor:
         self.max_workers = min(8, os.cpu_count() or 4)  # Use available CPUs efficiently
         self.chunk_size = 1024 * 1024  # 1MB chunks for memory management
         
+        # Measured on the sample PDF: a spawned page worker needs ~0.18s to start, mostly
+        # re-importing fitz, numpy and orjson, against ~5ms of extraction per page
+        self.page_worker_startup = 0.18  # Seconds per worker
+        self.page_extraction_time = 0.005  # Seconds per page
+        
     def extract_document_metadata(self, doc):
         """Extract document metadata efficiently"""
         metadata = doc.metadata
         
-        # Convert dates safely
-        creation_date = ""
-        modification_date = ""
-        
-        try:
-            if metadata.get('creationDate'):
-                # Handle PDF date format (D:YYYYMMDDHHmmSSOHH'mm')
-                date_str = metadata['creationDate']
-                if date_str.startswith('D:'):
-                    date_str = date_str[2:16]  # Extract YYYYMMDDHHMMSS part
-                    creation_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]} {date_str[8:10]}:{date_str[10:12]}:{date_str[12:14]}"
-                else:
-                    creation_date = date_str
-        except:
-            creation_date = ""
-            
-        try:
-            if metadata.get('modDate'):
-                date_str = metadata['modDate']
-                if date_str.startswith('D:'):
-                    date_str = date_str[2:16]
-                    modification_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]} {date_str[8:10]}:{date_str[10:12]}:{date_str[12:14]}"
-                else:
-                    modification_date = date_str
-        except:
-            modification_date = ""
-        
         return {
-            "creation_date": creation_date,
-            "modification_date": modification_date,
+            "creation_date": _pdfdate(metadata.get('creationDate', '')),
+            "modification_date": _pdfdate(metadata.get('modDate', '')),
             "author": metadata.get('author', ''),
             "title": metadata.get('title', ''),
             "subject": metadata.get('subject', '')
         }
     
-    def detect_tables(self, page):
+    def detect_tables(self, page, text_dict):
+        """Detect ruled tables with PyMuPDF, falling back to text alignment"""
+        tables = []
+        
+        # Ruled tables need vector line art, so skip the finder on pages without any
+        if page.get_cdrawings():
+            # find_tables switches on small glyph heights process-wide and never restores
+            # it, which would shift the bboxes of every later get_text("dict") call
+            small_glyph_heights = fitz.TOOLS.set_small_glyph_heights()
+            try:
+                found = page.find_tables(vertical_strategy="lines_strict",
+                                         horizontal_strategy="lines_strict")
+                for table in found.tables:
+                    tables.append({
+                        "bbox": list(table.bbox),
+                        "rows": table.row_count,
+                        "columns": table.col_count,
+                        "data": [[cell or "" for cell in row] for row in table.extract()]
+                    })
+            except Exception:
+                # A finder failure costs this page its ruled tables, not the document its output
+                tables = []
+            finally:
+                fitz.TOOLS.set_small_glyph_heights(small_glyph_heights)
+        
+        if tables:
+            return tables
+        
+        return self.detect_text_tables(text_dict)
+    
+    def detect_text_tables(self, text_dict):
         """Simple table detection using text blocks and positioning"""
         tables = []
-        text_dict = page.get_text("dict")
         
-        # Group text blocks by similar y-coordinates (rows)
-        rows = {}
-        for block in text_dict["blocks"]:
-            if "lines" in block:
-                for line in block["lines"]:
-                    y = round(line["bbox"][1], 1)  # Round y-coordinate
-                    if y not in rows:
-                        rows[y] = []
-                    
-                    line_text = ""
-                    for span in line["spans"]:
-                        line_text += span["text"] + " "
-                    
-                    if line_text.strip():
-                        rows[y].append({
-                            "x": line["bbox"][0],
-                            "text": line_text.strip(),
-                            "bbox": line["bbox"]
-                        })
-        
-        # Detect table-like structures (multiple aligned columns)
-        potential_tables = []
-        row_keys = sorted(rows.keys())
-        
-        for i in range(len(row_keys) - 2):  # Need at least 3 rows for a table
-            current_rows = []
-            y_start = row_keys[i]
+        lines = [
+            line for block in text_dict["blocks"] if "lines" in block
+            for line in block["lines"]
+        ]
+        if len(lines) < 3:  # Need at least 3 rows for a table
+            return tables
+        
+        texts = [" ".join(span["text"] for span in line["spans"]).strip() for line in lines]
+        bboxes = np.array([line["bbox"] for line in lines], dtype=np.float64)
+        has_text = np.fromiter((bool(text) for text in texts), dtype=bool, count=len(texts))
+        
+        # Group lines into rows by rounded y-coordinate, left-to-right within each row
+        ys = np.round(bboxes[:, 1], 1)
+        order = np.lexsort((bboxes[:, 0], ys))
+        _, row_starts = np.unique(ys[order], return_index=True)
+        row_ends = np.append(row_starts[1:], len(order))
+        
+        # A row is a table candidate when it has multiple non-empty columns
+        row_columns = np.add.reduceat(has_text[order].astype(np.int32), row_starts)
+        multi_column = row_columns >= 2
+        
+        # Detect table-like structures (runs of 3+ multi-column rows, up to 10 rows each)
+        num_rows = len(row_starts)
+        i = 0
+        while i < num_rows - 2:
+            run = 0
+            while run < 10 and i + run < num_rows and multi_column[i + run]:
+                run += 1
             
-            # Check next few rows for alignment
-            for j in range(i, min(i + 10, len(row_keys))):  # Check up to 10 rows
-                y = row_keys[j]
-                if len(rows[y]) >= 2:  # Multiple columns
-                    current_rows.append(rows[y])
-                else:
-                    break
+            if run < 3:
+                i += run + 1  # No valid table can start inside this short run
+                continue
             
-            if len(current_rows) >= 3:  # Valid table with 3+ rows
-                # Convert to table format
-                table_data = []
-                max_cols = max(len(row) for row in current_rows)
-                
-                for row in current_rows:
-                    # Sort by x-coordinate and pad missing columns
-                    sorted_row = sorted(row, key=lambda x: x["x"])
-                    row_data = [item["text"] for item in sorted_row]
-                    
-                    # Pad with empty strings if needed
-                    while len(row_data) < max_cols:
-                        row_data.append("")
-                    
-                    table_data.append(row_data[:max_cols])  # Ensure consistent column count
-                
-                if table_data:
-                    # Calculate bounding box
-                    all_bboxes = []
-                    for row in current_rows:
-                        for item in row:
-                            all_bboxes.append(item["bbox"])
-                    
-                    if all_bboxes:
-                        min_x = min(bbox[0] for bbox in all_bboxes)
-                        min_y = min(bbox[1] for bbox in all_bboxes)
-                        max_x = max(bbox[2] for bbox in all_bboxes)
-                        max_y = max(bbox[3] for bbox in all_bboxes)
-                        
-                        tables.append({
-                            "bbox": [min_x, min_y, max_x, max_y],
-                            "rows": len(table_data),
-                            "columns": max_cols,
-                            "data": table_data
-                        })
-                
-                # Skip processed rows
-                i = j
+            # Convert to table format, padding missing columns
+            max_cols = int(row_columns[i:i + run].max())
+            table_data = []
+            members = []
+            for r in range(i, i + run):
+                row = order[row_starts[r]:row_ends[r]]
+                row = row[has_text[row]]
+                members.append(row)
+                row_data = [texts[k] for k in row]
+                table_data.append(row_data + [""] * (max_cols - len(row_data)))
+            
+            # Calculate bounding box
+            table_bboxes = bboxes[np.concatenate(members)]
+            tables.append({
+                "bbox": [
+                    float(table_bboxes[:, 0].min()), float(table_bboxes[:, 1].min()),
+                    float(table_bboxes[:, 2].max()), float(table_bboxes[:, 3].max())
+                ],
+                "rows": len(table_data),
+                "columns": max_cols,
+                "data": table_data
+            })
+            
+            # Skip processed rows
+            i += run
         
         return tables
     
     def process_single_page(self, page, page_num):
         """Process a single page efficiently"""
-        # Extract text with formatting information
-        text_dict = page.get_text("dict")
-        page_text = page.get_text()
+        # Pages without content streams (blank separators) have nothing to extract
+        if not page.get_contents():
+            return {
+                "page_number": page_num + 1,
+                "text_content": "",
+                "text_blocks": [],
+                "images": [],
+                "tables": []
+            }
+        
+        # Extract text with formatting information once; everything else reuses it
+        text_dict = page.get_text("dict", flags=TEXT_FLAGS)
+        page_text = "".join(
+            "".join(span["text"] for span in line["spans"]) + "\n"
+            for block in text_dict["blocks"] if "lines" in block
+            for line in block["lines"]
+        )
         
         # Extract text blocks with formatting
         text_blocks = []
         for block in text_dict["blocks"]:
             if "lines" in block:
-                block_text = ""
-                font_info = {"size": 12, "name": "unknown"}
-                
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        block_text += span["text"]
-                        # Get font information from first span
-                        if span["text"].strip():
-                            font_info["size"] = span.get("size", 12)
-                            font_info["name"] = span.get("font", "unknown")
+                spans = [span for line in block["lines"] for span in line["spans"]]
+                block_text = "".join(span["text"] for span in spans).strip()
                 
-                if block_text.strip():
+                if block_text:
+                    # Font information comes from the last non-blank span, so bullet glyphs don't win
+                    font_span = next((span for span in reversed(spans) if span["text"].strip()), {})
                     text_blocks.append({
                         "bbox": block["bbox"],
-                        "text": block_text.strip(),
-                        "font_size": font_info["size"],
-                        "font": font_info["name"]
+                        "text": block_text,
+                        "font_size": font_span.get("size", 12),
+                        "font": sys.intern(font_span.get("font", "unknown"))  # Few distinct names, shared across blocks
                     })
         
-        # Extract images
+        # Extract image placement and dimensions without decoding pixel data
+        # (xrefs=True would hash every image's pixels just to match it to an xref we never use)
         images = []
-        image_list = page.get_images()
-        for img_index, img in enumerate(image_list):
-            try:
-                xref = img[0]
-                base_image = page.parent.extract_image(xref)
-                image_bbox = page.get_image_bbox(img)
-                
-                images.append({
-                    "bbox": list(image_bbox),
-                    "width": base_image["width"],
-                    "height": base_image["height"]
-                })
-            except:
-                # Skip problematic images
-                continue
+        for info in page.get_image_info():
+            images.append({
+                "bbox": list(info["bbox"]),
+                "width": info["width"],
+                "height": info["height"]
+            })
         
-        # Detect tables
-        tables = self.detect_tables(page)
+        # Detect tables (image-only pages have no cell text to find)
+        tables = self.detect_tables(page, text_dict) if text_blocks else []
         
         return {
             "page_number": page_num + 1,
@@ -209,9 +217,13 @@ class OptimizedPDFProcessor:
         if not text:
             return "unknown"
         
+        # Pure-ASCII text can only contain Latin letters, so the ratio is 1 if any exist
+        if text.isascii():
+            return "en" if _LATIN_RE.search(text) else "unknown"
+        
         # Count different character types
-        latin_chars = len(re.findall(r'[a-zA-Z]', text))
-        total_chars = len(re.findall(r'[a-zA-Z\u00C0-\u017F\u0400-\u04FF\u4E00-\u9FFF]', text))
+        latin_chars = sum(map(text.count, string.ascii_letters))
+        total_chars = len(_SCRIPT_RE.findall(text))
         
         if total_chars == 0:
             return "unknown"
@@ -225,7 +237,41 @@ class OptimizedPDFProcessor:
         else:
             return "non-latin"
     
-    def process_pdf(self, pdf_path):
+    def process_page_range(self, pdf_path, start, end):
+        """Process pages [start, end) using a separately opened document"""
+        doc = fitz.open(pdf_path)
+        try:
+            return [self.process_single_page(doc[page_num], page_num) for page_num in range(start, end)]
+        finally:
+            doc.close()
+    
+    def process_pages_sequential(self, doc, total_pages):
+        """Process pages one after another in the current process"""
+        pages_data = [None] * total_pages
+        for page_num, page in enumerate(doc):
+            pages_data[page_num] = self.process_single_page(page, page_num)
+        return pages_data
+    
+    def process_pages_parallel(self, pdf_path, total_pages, page_workers):
+        """Process a large PDF's pages in contiguous chunks across worker processes"""
+        chunk = -(-total_pages // page_workers)  # Ceiling division
+        starts = list(range(0, total_pages, chunk))
+        ends = [min(start + chunk, total_pages) for start in starts]
+        
+        # MuPDF documents are not fork-safe everywhere, so each worker starts fresh and reopens the file
+        with ProcessPoolExecutor(max_workers=len(starts), mp_context=mp.get_context("spawn")) as executor:
+            chunks = executor.map(self.process_page_range, [pdf_path] * len(starts), starts, ends)
+            return [page_data for chunk_pages in chunks for page_data in chunk_pages]
+    
+    def should_split_pages(self, total_pages, page_workers):
+        """Split only when the time saved clearly outweighs starting the page workers"""
+        if page_workers < 2:
+            return False
+        saved = total_pages * self.page_extraction_time * (1 - 1 / page_workers)
+        # Workers importing at the same time slow each other down, so require twice the startup
+        return saved > 2 * self.page_worker_startup
+    
+    def process_pdf(self, pdf_path, page_workers=1):
         """Process a single PDF file with optimizations"""
         start_time = time.time()
         filename = pdf_path.name
@@ -238,27 +284,13 @@ class OptimizedPDFProcessor:
             # Extract metadata
             metadata = self.extract_document_metadata(doc)
             
-            # Process pages in batches to manage memory
-            pages_data = []
-            batch_size = min(10, total_pages)  # Process in batches of 10 pages
-            
-            for batch_start in range(0, total_pages, batch_size):
-                batch_end = min(batch_start + batch_size, total_pages)
-                batch_pages = []
-                
-                # Process batch of pages
-                for page_num in range(batch_start, batch_end):
-                    page = doc[page_num]
-                    page_data = self.process_single_page(page, page_num)
-                    batch_pages.append(page_data)
-                    
-                    # Clean up page resources
-                    page = None
-                
-                pages_data.extend(batch_pages)
-                
-                # Force garbage collection after each batch
-                gc.collect()
+            if self.should_split_pages(total_pages, page_workers):
+                # The page workers reopen the file, so release this copy before they start
+                doc.close()
+                doc = None
+                pages_data = self.process_pages_parallel(pdf_path, total_pages, page_workers)
+            else:
+                pages_data = self.process_pages_sequential(doc, total_pages)
             
             # Calculate summary statistics
             total_text_length = sum(len(page["text_content"]) for page in pages_data)
@@ -288,22 +320,27 @@ class OptimizedPDFProcessor:
                 }
             }
             
-            # Save JSON output
-            output_file = self.output_dir / f"{pdf_path.stem}.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Serialize here; the parent hands the bytes to its writer threads
+            output_json = orjson.dumps(output_data, option=orjson.OPT_INDENT_2)
             
-            doc.close()
-            doc = None
+            if doc is not None:
+                doc.close()
+                doc = None
             
             processing_time = time.time() - start_time
             print(f"Processed {filename}: {total_pages} pages in {processing_time:.2f}s")
             
-            return True, filename, processing_time
+            return True, filename, processing_time, output_json
             
         except Exception as e:
             print(f"Error processing {filename}: {str(e)}")
-            return False, filename, 0
+            return False, filename, 0, None
+    
+    def write_output(self, pdf_path, output_json):
+        """Write a serialized JSON result next to the other outputs"""
+        output_file = self.output_dir / f"{pdf_path.stem}.json"
+        with open(output_file, 'wb') as f:
+            f.write(output_json)
     
     def process_all_pdfs(self):
         """Process all PDFs in the input directory with parallel processing"""
@@ -311,7 +348,12 @@ class OptimizedPDFProcessor:
             print(f"Input directory {self.input_dir} does not exist!")
             return
         
-        pdf_files = list(self.input_dir.glob("*.pdf"))
+        # Single scandir pass; glob's "*.pdf" also skips hidden files such as "._x.pdf"
+        with os.scandir(self.input_dir) as entries:
+            pdf_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".pdf") and not entry.name.startswith(".") and entry.is_file()
+            ]
         if not pdf_files:
             print("No PDF files found in input directory!")
             return
@@ -322,26 +364,42 @@ class OptimizedPDFProcessor:
         successful = 0
         total_time = 0
         
-        # For memory efficiency, limit concurrent processing
-        max_concurrent = min(4, self.max_workers, len(pdf_files))
+        # Extraction is CPU-bound, so run one PDF per process to sidestep the GIL
+        max_concurrent = min(self.max_workers, len(pdf_files))
+        
+        # CPUs left over when there are fewer PDFs than workers go to splitting large PDFs by page
+        page_workers = max(1, self.max_workers // max_concurrent)
         
-        with ThreadPoolExecutor(max_workers=max_concurrent) as executor:
-            # Submit all tasks
+        # Writes go through their own small thread pool so slow output volumes don't stall extraction
+        with ProcessPoolExecutor(max_workers=max_concurrent) as executor, \
+                ThreadPoolExecutor(max_workers=2) as write_pool:
+            # Submit all tasks (the processor only holds paths, so it pickles cheaply)
             future_to_pdf = {
-                executor.submit(self.process_pdf, pdf_file): pdf_file 
+                executor.submit(self.process_pdf, pdf_file, page_workers): pdf_file 
                 for pdf_file in pdf_files
             }
             
-            # Process completed tasks
+            # Process completed tasks, queueing each result for writing
+            write_to_pdf = {}
             for future in as_completed(future_to_pdf):
                 pdf_file = future_to_pdf[future]
                 try:
-                    success, filename, proc_time = future.result()
+                    success, filename, proc_time, output_json = future.result()
                     if success:
-                        successful += 1
-                        total_time += proc_time
+                        write_future = write_pool.submit(self.write_output, pdf_file, output_json)
+                        write_to_pdf[write_future] = (pdf_file, proc_time)
                 except Exception as e:
                     print(f"Exception processing {pdf_file.name}: {str(e)}")
+            
+            # Wait for outstanding writes
+            for future in as_completed(write_to_pdf):
+                pdf_file, proc_time = write_to_pdf[future]
+                try:
+                    future.result()
+                    successful += 1
+                    total_time += proc_time
+                except Exception as e:
+                    print(f"Error writing output for {pdf_file.name}: {str(e)}")
         
         print(f"\nProcessing complete!")
         print(f"Successfully processed: {successful}/{len(pdf_files)} files")
@@ -364,9 +422,6 @@ def main():
     
     total_time = time.time() - start_time
     print(f"\nTotal execution time: {total_time:.2f}s")
-    
-    # Force final cleanup
-    gc.collect()
 
 if __name__ == "__main__":
     main()
@@ -4,15 +4,66 @@ Comprehensive Python Testing Script for PDF Processing Solution
 Tests performance, accuracy, and compliance with hackathon requirements
 """
 
+import io
 import os
 import sys
 import json
 import time
+import queue
+import threading
 import subprocess
 import shutil
+import hashlib
+import atexit
+import platform
+import argparse
+import statistics
 from pathlib import Path
 from datetime import datetime
+from collections import deque
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import fastjsonschema  # Optional: compiles the output schema into a fast validator
+except ImportError:
+    fastjsonschema = None
+
+try:
+    import orjson  # Optional: C JSON parser; its JSONDecodeError subclasses json's
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa  # Optional: stores timings across runs for regression checks
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Files copied into the Docker image; the build is skipped when none of them change
+BUILD_INPUTS = ['Dockerfile', 'requirements.txt', 'process_pdfs.py']
+
+SCHEMA_FILE = "sample_dataset/schema/output_schema.json"
+
+# platform.machine() names for amd64, the platform the solution is submitted for
+NATIVE_AMD64_MACHINES = ('x86_64', 'AMD64')
+
+# Per-PDF timings from every run, compared against the median of the most recent runs
+PERF_HISTORY = "perf_history.parquet"
+PERF_HISTORY_RUNS = 10
+PERF_REGRESSION_FACTOR = 1.1
+
+# Tool versions reported by --verbose, keyed by command, resolved path and its mtime
+PREREQ_CACHE = Path.home() / '.cache' / 'pdf_tester' / 'prereq.json'
+
+# Lines of command output kept for error reporting
+OUTPUT_TAIL_LINES = 50
+
+# On Linux the container's input is staged on tmpfs, so its PDF reads never touch disk
+TMPFS_ROOT = Path("/dev/shm")
+
+# PDFs per container run when measuring amortized per-PDF processing time
+BATCH_SIZES = [1, 4, 16]
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -25,219 +76,158 @@ class Colors:
     WHITE = '\033[1;37m'
     RESET = '\033[0m'
 
-class PDFSolutionTester:
-    def __init__(self):
-        self.test_results = {
-            'setup': False,
-            'docker_build': False,
-            'processing': False,
-            'performance': False,
-            'validation': False,
-            'schema_compliance': False
-        }
-        self.start_time = None
-        self.processing_times = []
-        
-    def print_status(self, message, color=Colors.BLUE):
-        print(f"{color}[INFO]{Colors.RESET} {message}")
+# Redirected output gets plain text instead of escape codes
+if not sys.stdout.isatty():
+    for _name in [name for name in vars(Colors) if name.isupper()]:
+        setattr(Colors, _name, '')
+
+# Message prefixes are built once here rather than on every print
+_PFX_INFO = f"{Colors.BLUE}[INFO]{Colors.RESET} "
+_PFX_SUCCESS = f"{Colors.GREEN}[SUCCESS]{Colors.RESET} "
+_PFX_ERROR = f"{Colors.RED}[ERROR]{Colors.RESET} "
+_PFX_WARNING = f"{Colors.YELLOW}[WARNING]{Colors.RESET} "
+_HEADER_RULE = f"{Colors.WHITE}{'=' * 60}{Colors.RESET}"
+
+def load_json_file(path):
+    """Parse a JSON file, with orjson when it is available"""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def build_simple_pdf(filename):
+    """Create a simple single-page PDF"""
+    try:
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
         
-    def print_success(self, message):
-        print(f"{Colors.GREEN}[SUCCESS]{Colors.RESET} {message}")
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
+        c.drawString(100, 750, "Simple Test Document")
+        c.drawString(100, 700, "This is a basic single-page PDF for testing.")
+        c.drawString(100, 650, "Author: Test Suite")
+        c.drawString(100, 600, "Date: 2024-01-15")
         
-    def print_error(self, message):
-        print(f"{Colors.RED}[ERROR]{Colors.RESET} {message}")
+        # Add some structured text
+        c.drawString(100, 550, "Key Features:")
+        c.drawString(120, 520, "• Single page document")
+        c.drawString(120, 490, "• Simple text content")
+        c.drawString(120, 460, "• Basic metadata")
         
-    def print_warning(self, message):
-        print(f"{Colors.YELLOW}[WARNING]{Colors.RESET} {message}")
+        c.save()
+        Path(filename).write_bytes(buffer.getvalue())  # One write once the PDF is complete
+        return f"Created simple PDF: {filename}"
         
-    def print_header(self, message):
-        print(f"\n{Colors.WHITE}{'='*60}{Colors.RESET}")
-        print(f"{Colors.WHITE}{message.center(60)}{Colors.RESET}")
-        print(f"{Colors.WHITE}{'='*60}{Colors.RESET}\n")
+    except ImportError:
+        return build_minimal_pdf(filename, "Simple Test PDF")
 
-    def check_prerequisites(self):
-        """Check if all required tools are available"""
-        self.print_header("CHECKING PREREQUISITES")
+def build_complex_pdf(filename):
+    """Create a multi-page PDF with tables and images"""
+    try:
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import Table, TableStyle
         
-        required_commands = {
-            'docker': 'Docker containerization platform',
-            'python3': 'Python 3 interpreter'
-        }
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
         
-        missing_commands = []
+        # Page 1: Title page
+        c.drawString(100, 750, "Complex Multi-Page Test Document")
+        c.drawString(100, 700, "This document tests advanced PDF processing capabilities.")
+        c.showPage()
         
-        for cmd, description in required_commands.items():
-            try:
-                result = subprocess.run([cmd, '--version'], 
-                                      capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    version = result.stdout.strip().split('\n')[0]
-                    self.print_success(f"{description}: {version}")
-                else:
-                    missing_commands.append(cmd)
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                missing_commands.append(cmd)
-                
-        if missing_commands:
-            self.print_error(f"Missing required commands: {', '.join(missing_commands)}")
-            return False
-            
-        # Check current directory structure
-        required_files = ['Dockerfile', 'process_pdfs.py', 'requirements.txt']
-        missing_files = []
+        # Page 2: Table-like content
+        c.drawString(100, 750, "Data Table Example")
         
-        for file in required_files:
-            if not os.path.exists(file):
-                missing_files.append(file)
-                
-        if missing_files:
-            self.print_error(f"Missing required files: {', '.join(missing_files)}")
-            self.print_status("Please ensure you're in the Challenge_1a directory with all solution files")
-            return False
-            
-        self.print_success("All prerequisites satisfied")
-        self.test_results['setup'] = True
-        return True
-
-    def create_test_pdfs(self):
-        """Create comprehensive test PDFs for different scenarios"""
-        self.print_header("CREATING TEST PDFs")
+        # Create table-like structure manually
+        y = 700
+        headers = ["Name", "Age", "City", "Score"]
+        data = [
+            ["John Doe", "25", "New York", "95"],
+            ["Jane Smith", "30", "Los Angeles", "87"],
+            ["Bob Johnson", "35", "Chicago", "92"],
+            ["Alice Brown", "28", "Houston", "89"],
+            ["Charlie Wilson", "32", "Phoenix", "94"]
+        ]
         
-        test_dir = Path("test_input")
-        test_dir.mkdir(exist_ok=True)
+        # Draw headers
+        x_positions = [100, 200, 300, 400]
+        for i, header in enumerate(headers):
+            c.drawString(x_positions[i], y, header)
         
-        # Test PDF 1: Simple single page
-        self.create_simple_pdf(test_dir / "simple_test.pdf")
+        y -= 30
+        # Draw data rows
+        for row in data:
+            for i, cell in enumerate(row):
+                c.drawString(x_positions[i], y, cell)
+            y -= 25
         
-        # Test PDF 2: Multi-page with tables
-        self.create_complex_pdf(test_dir / "complex_test.pdf")
+        c.showPage()
         
-        # Test PDF 3: Large document (simulate 50 pages)
-        self.create_large_pdf(test_dir / "large_test.pdf")
+        # Page 3: Mixed content
+        c.drawString(100, 750, "Mixed Content Page")
+        c.drawString(100, 700, "This page contains various content types for testing.")
         
-        # Count created PDFs
-        pdf_files = list(test_dir.glob("*.pdf"))
-        self.print_success(f"Created {len(pdf_files)} test PDF files")
+        # Simulate image placeholder
+        c.rect(100, 500, 200, 150, stroke=1, fill=0)
+        c.drawString(110, 620, "[Image Placeholder 200x150]")
         
-        return len(pdf_files) > 0
-
-    def create_simple_pdf(self, filename):
-        """Create a simple single-page PDF"""
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter
-            
-            c = canvas.Canvas(str(filename), pagesize=letter)
-            c.drawString(100, 750, "Simple Test Document")
-            c.drawString(100, 700, "This is a basic single-page PDF for testing.")
-            c.drawString(100, 650, "Author: Test Suite")
-            c.drawString(100, 600, "Date: 2024-01-15")
-            
-            # Add some structured text
-            c.drawString(100, 550, "Key Features:")
-            c.drawString(120, 520, "• Single page document")
-            c.drawString(120, 490, "• Simple text content")
-            c.drawString(120, 460, "• Basic metadata")
-            
-            c.save()
-            self.print_success(f"Created simple PDF: {filename}")
-            
-        except ImportError:
-            self.create_minimal_pdf(filename, "Simple Test PDF")
-
-    def create_complex_pdf(self, filename):
-        """Create a multi-page PDF with tables and images"""
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import Table, TableStyle
-            
-            c = canvas.Canvas(str(filename), pagesize=letter)
-            
-            # Page 1: Title page
-            c.drawString(100, 750, "Complex Multi-Page Test Document")
-            c.drawString(100, 700, "This document tests advanced PDF processing capabilities.")
-            c.showPage()
-            
-            # Page 2: Table-like content
-            c.drawString(100, 750, "Data Table Example")
-            
-            # Create table-like structure manually
-            y = 700
-            headers = ["Name", "Age", "City", "Score"]
-            data = [
-                ["John Doe", "25", "New York", "95"],
-                ["Jane Smith", "30", "Los Angeles", "87"],
-                ["Bob Johnson", "35", "Chicago", "92"],
-                ["Alice Brown", "28", "Houston", "89"],
-                ["Charlie Wilson", "32", "Phoenix", "94"]
-            ]
-            
-            # Draw headers
-            x_positions = [100, 200, 300, 400]
-            for i, header in enumerate(headers):
-                c.drawString(x_positions[i], y, header)
-            
-            y -= 30
-            # Draw data rows
-            for row in data:
-                for i, cell in enumerate(row):
-                    c.drawString(x_positions[i], y, cell)
-                y -= 25
-            
-            c.showPage()
-            
-            # Page 3: Mixed content
-            c.drawString(100, 750, "Mixed Content Page")
-            c.drawString(100, 700, "This page contains various content types for testing.")
-            
-            # Simulate image placeholder
-            c.rect(100, 500, 200, 150, stroke=1, fill=0)
-            c.drawString(110, 620, "[Image Placeholder 200x150]")
-            
-            c.save()
-            self.print_success(f"Created complex PDF: {filename}")
-            
-        except ImportError:
-            self.create_multi_page_minimal_pdf(filename)
+        c.save()
+        Path(filename).write_bytes(buffer.getvalue())
+        return f"Created complex PDF: {filename}"
+        
+    except ImportError:
+        return build_multi_page_minimal_pdf(filename)
 
-    def create_large_pdf(self, filename):
-        """Create a larger PDF to test performance (simulating 50 pages)"""
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter
+def build_large_pdf(filename):
+    """Create a larger PDF to test performance (simulating 50 pages)"""
+    try:
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+        
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter, pageCompression=1)
+        
+        # The paragraphs are identical on every page, so they are drawn once into a form
+        # XObject that each page references; only the header lines are drawn per page
+        c.beginForm('body')
+        body = c.beginText()
+        body.setFont('Helvetica', 12, leading=15)
+        y = 650
+        for para in range(15):  # 15 paragraphs per page
+            text = f"Paragraph {para + 1}: Lorem ipsum dolor sit amet, consectetur adipiscing elit. " \
+                   f"Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua."
+            body.setTextOrigin(100, y)
+            body.textLine(text[:80])  # Wrap text
+            if len(text) > 80:
+                body.textLine(text[80:])
+            y -= 35
             
-            c = canvas.Canvas(str(filename), pagesize=letter)
+            if y < 100:  # Prevent text from going off page
+                break
+        c.drawText(body)
+        c.endForm()
+        
+        # Create 10 pages (reduced for faster testing, but structured like 50 pages)
+        page_count = 10
+        for page_num in range(1, page_count + 1):
+            c.drawString(100, 750, f"Large Document Test - Page {page_num}")
+            c.drawString(100, 700, f"This is page {page_num} of a large document test.")
+            c.doForm('body')
             
-            # Create 10 pages (reduced for faster testing, but structured like 50 pages)
-            for page_num in range(1, 11):
-                c.drawString(100, 750, f"Large Document Test - Page {page_num}")
-                c.drawString(100, 700, f"This is page {page_num} of a large document test.")
-                
-                # Add substantial content per page
-                y = 650
-                for para in range(15):  # 15 paragraphs per page
-                    text = f"Paragraph {para + 1}: Lorem ipsum dolor sit amet, consectetur adipiscing elit. " \
-                           f"Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. Page {page_num}."
-                    c.drawString(100, y, text[:80])  # Wrap text
-                    if len(text) > 80:
-                        c.drawString(100, y - 15, text[80:])
-                    y -= 35
-                    
-                    if y < 100:  # Prevent text from going off page
-                        break
-                
+            # save() emits the last page itself
+            if page_num < page_count:
                 c.showPage()
-            
-            c.save()
-            self.print_success(f"Created large PDF: {filename} (10 pages)")
-            
-        except ImportError:
-            self.create_minimal_pdf(filename, f"Large Test PDF - Multiple Pages")
+        
+        c.save()
+        Path(filename).write_bytes(buffer.getvalue())
+        return f"Created large PDF: {filename} (10 pages)"
+        
+    except ImportError:
+        return build_minimal_pdf(filename, f"Large Test PDF - Multiple Pages")
 
-    def create_minimal_pdf(self, filename, title="Test PDF"):
-        """Create minimal PDF without reportlab (fallback)"""
-        pdf_content = f"""%PDF-1.4
+# Fallback PDF bodies, kept as bytes so each fixture is one write_bytes call
+MINIMAL_PDF_TEMPLATE = b"""%PDF-1.4
 1 0 obj
 <<
 /Type /Catalog
@@ -270,7 +260,7 @@ stream
 BT
 /F1 12 Tf
 100 700 Td
-({title}) Tj
+(__TITLE__) Tj
 0 -20 Td
 (Created for testing purposes) Tj
 ET
@@ -292,14 +282,13 @@ trailer
 startxref
 300
 %%EOF"""
-        
-        with open(filename, 'w') as f:
-            f.write(pdf_content)
-        self.print_success(f"Created minimal PDF: {filename}")
 
-    def create_multi_page_minimal_pdf(self, filename):
-        """Create multi-page minimal PDF without reportlab"""
-        pdf_content = """%PDF-1.4
+def build_minimal_pdf(filename, title="Test PDF"):
+    """Create minimal PDF without reportlab (fallback)"""
+    Path(filename).write_bytes(MINIMAL_PDF_TEMPLATE.replace(b"__TITLE__", title.encode()))
+    return f"Created minimal PDF: {filename}"
+
+MULTI_PAGE_MINIMAL_PDF = b"""%PDF-1.4
 1 0 obj
 <<
 /Type /Catalog
@@ -410,43 +399,296 @@ trailer
 startxref
 770
 %%EOF"""
+
+def build_multi_page_minimal_pdf(filename):
+    """Create multi-page minimal PDF without reportlab"""
+    Path(filename).write_bytes(MULTI_PAGE_MINIMAL_PDF)
+    return f"Created multi-page minimal PDF: {filename}"
+
+class PDFSolutionTester:
+    def __init__(self, verbose=False, cleanup_mode='interactive', force_amd64=False):
+        self.verbose = verbose
+        self.force_amd64 = force_amd64
+        self.cleanup_mode = cleanup_mode  # 'interactive', 'clean' or 'keep'
+        self.test_results = {
+            'setup': False,
+            'docker_build': False,
+            'processing': False,
+            'performance': False,
+            'validation': False,
+            'schema_compliance': False
+        }
+        self.start_time = None
+        self.processing_times = []
+        self.processed_pdfs = []  # Source fixture behind each entry of processing_times
+        self.container_id = None
+        self.tmpfs_stage_dir = None  # Per-run tmpfs directory, removed after processing
+        self.schema_validator = self.compile_schema_validator()
         
-        with open(filename, 'w') as f:
-            f.write(pdf_content)
-        self.print_success(f"Created multi-page minimal PDF: {filename}")
+    def compile_schema_validator(self):
+        """Compile the output schema into a validation function, if fastjsonschema is available"""
+        schema_file = Path(SCHEMA_FILE)
+        if fastjsonschema is None or not schema_file.exists():
+            return None
+        
+        return fastjsonschema.compile(load_json_file(schema_file))
 
-    def build_docker_image(self):
-        """Build the Docker image"""
-        self.print_header("BUILDING DOCKER IMAGE")
+    def print_status(self, message, color=None):
+        sys.stdout.write((_PFX_INFO if color is None else f"{color}[INFO]{Colors.RESET} ") + message + '\n')
+        
+    def print_success(self, message):
+        sys.stdout.write(_PFX_SUCCESS + message + '\n')
+        
+    def print_error(self, message):
+        sys.stdout.write(_PFX_ERROR + message + '\n')
+        
+    def print_warning(self, message):
+        sys.stdout.write(_PFX_WARNING + message + '\n')
+        
+    def print_header(self, message):
+        sys.stdout.write(f"\n{_HEADER_RULE}\n{Colors.WHITE}{message.center(60)}{Colors.RESET}\n{_HEADER_RULE}\n\n")
+
+    def load_prereq_cache(self):
+        """Load cached tool versions; a missing or unreadable cache is treated as empty"""
+        try:
+            return load_json_file(PREREQ_CACHE)
+        except (OSError, ValueError):
+            return {}
+
+    def save_prereq_cache(self, version_cache):
+        """Persist tool versions for later --verbose runs"""
+        try:
+            PREREQ_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            PREREQ_CACHE.write_text(json.dumps(version_cache, indent=2), encoding='utf-8')
+        except OSError as e:
+            self.print_warning(f"Could not write prerequisite cache: {e}")
+
+    def check_prerequisites(self):
+        """Check if all required tools are available"""
+        self.print_header("CHECKING PREREQUISITES")
+        
+        required_commands = {
+            'docker': 'Docker containerization platform',
+            'python3': 'Python 3 interpreter'
+        }
+        
+        missing_commands = []
+        version_cache = self.load_prereq_cache() if self.verbose else {}
+        cache_changed = False
+        
+        for cmd, description in required_commands.items():
+            path = shutil.which(cmd)
+            if not path:
+                missing_commands.append(cmd)
+                continue
+            
+            if not self.verbose:
+                self.print_success(f"{description}: {path}")
+                continue
+            
+            # Only spawn `--version` when the binary at this path has changed since last time
+            cache_key = f"{cmd}|{path}|{os.path.getmtime(path)}"
+            version = version_cache.get(cache_key)
+            if version is None:
+                try:
+                    result = subprocess.run([path, '--version'], 
+                                          capture_output=True, text=True, timeout=10)
+                except subprocess.TimeoutExpired:
+                    result = None
+                if result is None or result.returncode != 0:
+                    missing_commands.append(cmd)
+                    continue
+                version = result.stdout.strip().split('\n')[0]
+                version_cache[cache_key] = version
+                cache_changed = True
+            self.print_success(f"{description}: {version}")
+        
+        if cache_changed:
+            self.save_prereq_cache(version_cache)
+                
+        if missing_commands:
+            self.print_error(f"Missing required commands: {', '.join(missing_commands)}")
+            return False
+            
+        # Check current directory structure
+        required_files = ['Dockerfile', 'process_pdfs.py', 'requirements.txt']
+        missing_files = []
         
-        build_command = [
-            'docker', 'build', 
-            '--platform', 'linux/amd64',
-            '-t', 'pdf-processor',
-            '.'
+        for file in required_files:
+            if not os.path.exists(file):
+                missing_files.append(file)
+                
+        if missing_files:
+            self.print_error(f"Missing required files: {', '.join(missing_files)}")
+            self.print_status("Please ensure you're in the Challenge_1a directory with all solution files")
+            return False
+            
+        self.print_success("All prerequisites satisfied")
+        self.test_results['setup'] = True
+        return True
+
+    def create_test_pdfs(self):
+        """Create comprehensive test PDFs for different scenarios"""
+        self.print_header("CREATING TEST PDFs")
+        
+        test_dir = Path("test_input")
+        test_dir.mkdir(exist_ok=True)
+        
+        builders = [
+            (build_simple_pdf, test_dir / "simple_test.pdf"),    # Test PDF 1: Simple single page
+            (build_complex_pdf, test_dir / "complex_test.pdf"),  # Test PDF 2: Multi-page with tables
+            (build_large_pdf, test_dir / "large_test.pdf"),      # Test PDF 3: Large document (simulate 50 pages)
         ]
         
-        self.print_status("Running: " + ' '.join(build_command))
+        # The builders share no state, so generate them concurrently
+        with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(builders))) as executor:
+            futures = [executor.submit(builder, path) for builder, path in builders]
+            for future in futures:
+                self.print_success(future.result())
+        
+        # Count created PDFs
+        pdf_files = list(test_dir.glob("*.pdf"))
+        self.print_success(f"Created {len(pdf_files)} test PDF files")
+        
+        return len(pdf_files) > 0
+
+    def build_inputs_hash(self):
+        """Hash every file that goes into the Docker image"""
+        digest = hashlib.sha256()
+        for name in BUILD_INPUTS:
+            digest.update(Path(name).read_bytes())
+        return digest.hexdigest()
+
+    def start_command(self, command, env=None):
+        """Start a command with its output piped back for stream_command"""
+        return subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env=env
+        )
+
+    def stream_command(self, command, timeout, env=None, process=None):
+        """Run a command, or finish one from start_command, echoing its output as it arrives;
+        returns (returncode, last output lines)"""
+        if process is None:
+            process = self.start_command(command, env)
+        
+        # A reader thread lets the deadline be enforced even while the command is silent
+        lines = queue.Queue()
+        def read_output():
+            for line in process.stdout:
+                lines.put(line.rstrip('\n'))
+            lines.put(None)
+        threading.Thread(target=read_output, daemon=True).start()
+        
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        deadline = time.time() + timeout
+        try:
+            while True:
+                line = lines.get(timeout=max(0, deadline - time.time()))
+                if line is None:
+                    break
+                print(line)
+                tail.append(line)
+            return process.wait(timeout=max(0, deadline - time.time())), list(tail)
+        except (queue.Empty, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+            raise subprocess.TimeoutExpired(command, timeout)
+        except KeyboardInterrupt:
+            # Don't leave a multi-minute docker build running after Ctrl+C
+            process.kill()
+            process.wait()
+            raise
+
+    def start_docker_build(self):
+        """Start the Docker build in the background; build_docker_image reports on it"""
+        # Nothing is printed yet: build_docker_image replays these notes and then streams the
+        # output, which waits in the pipe meanwhile, so other work keeps its own log section
+        build = {'tag': None, 'command': None, 'process': None, 'start_time': None, 'notes': [], 'error': None}
         
         try:
-            start_time = time.time()
-            result = subprocess.run(
-                build_command,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+            # Every build is also tagged with a hash of its inputs; if that tag exists, reuse it
+            build['tag'] = f"pdf-processor:{self.build_inputs_hash()[:12]}"
+            cached = subprocess.run(['docker', 'image', 'inspect', build['tag']], capture_output=True)
+            if cached.returncode == 0 and subprocess.run(
+                    ['docker', 'tag', build['tag'], 'pdf-processor'], capture_output=True).returncode == 0:
+                return build
+            
+            # Native amd64 hosts need no --platform; elsewhere it stays, since the Dockerfile pins amd64
+            host = platform.machine()
+            if host in NATIVE_AMD64_MACHINES and not self.force_amd64:
+                platform_args = []
+                build['notes'].append(f"Host architecture {host}: building for the native platform")
+            else:
+                platform_args = ['--platform', 'linux/amd64']
+                build['notes'].append(f"Host architecture {host}: building for linux/amd64")
+            
+            # BuildKit with an inline cache lets rebuilds reuse unchanged layers of the previous image
+            build['command'] = [
+                'docker', 'build', 
+                *platform_args,
+                '--build-arg', 'BUILDKIT_INLINE_CACHE=1',
+                '--cache-from', 'pdf-processor',
+                '--progress', 'plain',
+                '-t', 'pdf-processor',
+                '-t', build['tag'],
+                '.'
+            ]
+            build['notes'].append("Running: " + ' '.join(build['command']))
+            
+            build['start_time'] = time.time()
+            build['process'] = self.start_command(build['command'], env={**os.environ, 'DOCKER_BUILDKIT': '1'})
+        except Exception as e:
+            build['error'] = e
+        
+        return build
+
+    def stop_docker_build(self, build):
+        """Kill a build from start_docker_build whose result is no longer needed"""
+        if build['process']:
+            build['process'].kill()
+            build['process'].wait()
+            build['process'].stdout.close()
+
+    def build_docker_image(self, build=None):
+        """Build the Docker image, or finish a build begun by start_docker_build"""
+        if build is None:
+            build = self.start_docker_build()
+        
+        self.print_header("BUILDING DOCKER IMAGE")
+        
+        for note in build['notes']:
+            self.print_status(note)
+        
+        if build['error']:
+            self.print_error(f"Docker build error: {build['error']}")
+            return False
+        
+        if build['process'] is None:
+            self.print_success(f"Build inputs unchanged, reusing cached image {build['tag']}")
+            self.test_results['docker_build'] = True
+            return True
+        
+        try:
+            returncode, tail = self.stream_command(
+                build['command'],
+                timeout=300,  # 5 minute timeout
+                process=build['process']
             )
             
-            build_time = time.time() - start_time
+            build_time = time.time() - build['start_time']
             
-            if result.returncode == 0:
+            if returncode == 0:
                 self.print_success(f"Docker image built successfully in {build_time:.1f}s")
                 self.test_results['docker_build'] = True
                 return True
             else:
-                self.print_error("Docker build failed")
-                self.print_error("STDOUT:", result.stdout)
-                self.print_error("STDERR:", result.stderr)
+                self.print_error(f"Docker build failed (exit code {returncode})")
+                self.print_error("Last build output:\n" + '\n'.join(tail))
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -456,6 +698,80 @@ startxref
             self.print_error(f"Docker build error: {e}")
             return False
 
+    def stage_pdfs(self, pdfs, stage_dir, output_dir, numbered=False):
+        """Replace the container's staged input with the given PDFs and clear old outputs"""
+        stage_dir.mkdir(exist_ok=True)
+        output_dir.mkdir(exist_ok=True)
+        
+        for file in stage_dir.glob("*.pdf"):
+            file.unlink()
+        for file in output_dir.glob("*.json"):
+            file.unlink()
+        
+        # Numbered copies let one fixture appear several times in a batch
+        for index, pdf in enumerate(pdfs):
+            name = f"batch{index:02d}_{pdf.name}" if numbered else pdf.name
+            shutil.copyfile(pdf, stage_dir / name)
+
+    def stage_directory(self):
+        """Host directory mounted as the container's /app/input"""
+        if sys.platform.startswith('linux') and TMPFS_ROOT.is_dir():
+            # Private to this run, so concurrent harness runs never clear each other's input
+            self.tmpfs_stage_dir = Path(tempfile.mkdtemp(dir=TMPFS_ROOT, prefix="pdf_test_input_"))
+            self.tmpfs_stage_dir.chmod(0o755)  # mkdtemp's 0700 would hide it from the container's app user
+            return self.tmpfs_stage_dir
+        return Path("test_stage")
+
+    def remove_tmpfs_stage(self):
+        """Free the tmpfs staging directory; it only holds copies of test_input"""
+        if self.tmpfs_stage_dir:
+            shutil.rmtree(self.tmpfs_stage_dir, ignore_errors=True)
+            self.tmpfs_stage_dir = None
+
+    def start_persistent_container(self, stage_dir, output_dir):
+        """Start one idle container that every processing run execs into"""
+        stage_dir.mkdir(exist_ok=True)
+        output_dir.mkdir(exist_ok=True)
+        
+        input_mount = f'type=bind,src={stage_dir.absolute()},dst=/app/input,readonly'
+        if sys.platform == 'darwin':
+            input_mount += ',consistency=cached'  # Skip Docker Desktop's host/VM sync checks
+        
+        start_command = [
+            'docker', 'run', '-d', '--rm',
+            '--mount', input_mount,
+            '-v', f'{output_dir.absolute()}:/app/output',
+            '--network', 'none',
+            '--entrypoint', 'sleep',
+            'pdf-processor', 'infinity'
+        ]
+        
+        self.print_status("Running: " + ' '.join(start_command))
+        result = subprocess.run(start_command, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(f"could not start container: {result.stderr.strip()}")
+        
+        self.container_id = result.stdout.strip()
+        # Also covers Ctrl+C and early exits, which skip the normal teardown
+        atexit.register(self.stop_persistent_container)
+
+    def stop_persistent_container(self):
+        """Remove the persistent container, if one is running"""
+        if self.container_id:
+            subprocess.run(['docker', 'rm', '-f', self.container_id], capture_output=True)
+            self.container_id = None
+
+    def run_container(self):
+        """Run the processor once, inside the persistent container, over the staged PDFs"""
+        run_command = ['docker', 'exec', self.container_id, 'python', '/app/process_pdfs.py']
+        
+        self.print_status("Running: " + ' '.join(run_command))
+        
+        self.start_time = time.time()
+        returncode, tail = self.stream_command(run_command, timeout=60)  # 1 minute timeout
+        
+        return returncode, tail, time.time() - self.start_time
+
     def test_docker_processing(self):
         """Test the Docker container with PDF processing"""
         self.print_header("TESTING PDF PROCESSING")
@@ -463,49 +779,50 @@ startxref
         # Prepare directories
         test_input = Path("test_input")
         test_output = Path("test_output")
-        test_output.mkdir(exist_ok=True)
-        
-        # Clean output directory
-        for file in test_output.glob("*.json"):
-            file.unlink()
         
-        # Run Docker container
-        run_command = [
-            'docker', 'run', '--rm',
-            '-v', f'{test_input.absolute()}:/app/input:ro',
-            '-v', f'{test_output.absolute()}:/app/output',
-            '--network', 'none',
-            'pdf-processor'
-        ]
+        fixtures = sorted(test_input.glob("*.pdf"))
+        if not fixtures:
+            self.print_error("No test PDFs to process")
+            return False, 0
         
-        self.print_status("Running: " + ' '.join(run_command))
+        # Each batch runs in a single container, amortizing its startup over every PDF;
+        # the last run covers the fixtures themselves so their outputs can be validated
+        batches = [[fixtures[i % len(fixtures)] for i in range(size)] for size in BATCH_SIZES]
+        batches.append(fixtures)
         
         try:
-            self.start_time = time.time()
-            result = subprocess.run(
-                run_command,
-                capture_output=True,
-                text=True,
-                timeout=60  # 1 minute timeout
-            )
+            test_stage = self.stage_directory()  # Mounted as the container's /app/input
             
-            processing_time = time.time() - self.start_time
-            self.processing_times.append(processing_time)
+            # Container startup is paid once here rather than per batch
+            try:
+                self.start_persistent_container(test_stage, test_output)
+            except RuntimeError as e:
+                if not self.tmpfs_stage_dir:
+                    raise
+                # Docker Desktop and remote daemons only see the host paths they share
+                self.print_warning(f"Cannot mount tmpfs staging directory, using test_stage/ ({e})")
+                self.remove_tmpfs_stage()
+                test_stage = Path("test_stage")
+                self.start_persistent_container(test_stage, test_output)
             
-            if result.returncode == 0:
-                self.print_success(f"Container executed successfully in {processing_time:.2f}s")
-                
-                # Show processing output
-                if result.stdout:
-                    self.print_status("Processing output:")
-                    print(result.stdout)
+            for batch_index, batch in enumerate(batches):
+                self.stage_pdfs(batch, test_stage, test_output, numbered=batch_index < len(batches) - 1)
+                returncode, tail, processing_time = self.run_container()
+                if returncode != 0:
+                    break
                 
+                per_pdf_time = processing_time / len(batch)
+                self.processing_times.extend([per_pdf_time] * len(batch))
+                self.processed_pdfs.extend(batch)
+                self.print_status(f"Batch of {len(batch)}: {processing_time:.2f}s total, {per_pdf_time:.2f}s per PDF")
+            
+            if returncode == 0:
+                self.print_success(f"Container executed successfully in {processing_time:.2f}s")
                 self.test_results['processing'] = True
                 return True, processing_time
             else:
-                self.print_error("Container execution failed")
-                self.print_error("STDOUT:", result.stdout)
-                self.print_error("STDERR:", result.stderr)
+                self.print_error(f"Container execution failed (exit code {returncode})")
+                self.print_error("Last container output:\n" + '\n'.join(tail))
                 return False, processing_time
                 
         except subprocess.TimeoutExpired:
@@ -514,6 +831,9 @@ startxref
         except Exception as e:
             self.print_error(f"Container execution error: {e}")
             return False, 0
+        finally:
+            self.stop_persistent_container()
+            self.remove_tmpfs_stage()
 
     def validate_output(self):
         """Validate the generated JSON output"""
@@ -522,8 +842,11 @@ startxref
         test_input = Path("test_input")
         test_output = Path("test_output")
         
-        input_pdfs = list(test_input.glob("*.pdf"))
-        output_jsons = list(test_output.glob("*.json"))
+        # One scandir pass per directory; the DirEntry objects are reused for every later lookup
+        with os.scandir(test_input) as entries:
+            input_pdfs = [entry for entry in entries if entry.name.endswith('.pdf')]
+        with os.scandir(test_output) as entries:
+            output_jsons = [entry for entry in entries if entry.name.endswith('.json')]
         
         self.print_status(f"Input PDFs: {len(input_pdfs)}")
         self.print_status(f"Output JSONs: {len(output_jsons)}")
@@ -534,8 +857,14 @@ startxref
         
         validation_passed = True
         
-        for json_file in output_jsons:
-            if not self.validate_single_json(json_file):
+        # Validation is mostly file I/O, so check files concurrently and report in order
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(output_jsons)))) as executor:
+            results = list(executor.map(self.validate_single_json, output_jsons))
+        
+        for valid, log in results:
+            for printer, message in log:
+                printer(message)
+            if not valid:
                 validation_passed = False
         
         if validation_passed:
@@ -546,56 +875,72 @@ startxref
             
         return validation_passed
 
-    def validate_single_json(self, json_file):
-        """Validate a single JSON file against the schema"""
+    def find_structure_error(self, data):
+        """Check required keys by hand, returning an error message or None"""
+        # Check top-level structure
+        required_top_keys = ['document_info', 'content']
+        for key in required_top_keys:
+            if key not in data:
+                return f"Missing top-level key '{key}'"
+        
+        # Validate document_info
+        doc_info = data['document_info']
+        required_doc_keys = ['filename', 'total_pages']
+        for key in required_doc_keys:
+            if key not in doc_info:
+                return f"Missing document_info key '{key}'"
+        
+        # Validate content structure
+        content = data['content']
+        required_content_keys = ['pages', 'summary']
+        for key in required_content_keys:
+            if key not in content:
+                return f"Missing content key '{key}'"
+        
+        # Validate pages array
+        pages = content['pages']
+        if not isinstance(pages, list) or len(pages) == 0:
+            return "Pages must be non-empty array"
+        
+        # Validate first page structure
+        first_page = pages[0]
+        required_page_keys = ['page_number', 'text_content', 'text_blocks']
+        for key in required_page_keys:
+            if key not in first_page:
+                return f"Missing page key '{key}'"
+        
+        # Validate summary
+        summary = content['summary']
+        required_summary_keys = ['total_text_length', 'total_images', 'total_tables']
+        for key in required_summary_keys:
+            if key not in summary:
+                return f"Missing summary key '{key}'"
+        
+        return None
+
+    def validate_single_json(self, entry):
+        """Validate a single JSON file against the schema, returning (valid, log messages)"""
+        # Messages are buffered so parallel validations print in a stable order
+        log = []
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Check top-level structure
-            required_top_keys = ['document_info', 'content']
-            for key in required_top_keys:
-                if key not in data:
-                    self.print_error(f"{json_file.name}: Missing top-level key '{key}'")
-                    return False
-            
-            # Validate document_info
-            doc_info = data['document_info']
-            required_doc_keys = ['filename', 'total_pages']
-            for key in required_doc_keys:
-                if key not in doc_info:
-                    self.print_error(f"{json_file.name}: Missing document_info key '{key}'")
-                    return False
+            data = load_json_file(entry.path)
             
-            # Validate content structure
-            content = data['content']
-            required_content_keys = ['pages', 'summary']
-            for key in required_content_keys:
-                if key not in content:
-                    self.print_error(f"{json_file.name}: Missing content key '{key}'")
-                    return False
-            
-            # Validate pages array
-            pages = content['pages']
-            if not isinstance(pages, list) or len(pages) == 0:
-                self.print_error(f"{json_file.name}: Pages must be non-empty array")
-                return False
+            # The compiled schema covers every field; the key checks are the fallback without it
+            if self.schema_validator is not None:
+                try:
+                    self.schema_validator(data)
+                    error = None if data['content']['pages'] else "Pages must be non-empty array"
+                except fastjsonschema.JsonSchemaException as e:
+                    error = f"Schema violation: {e}"
+            else:
+                error = self.find_structure_error(data)
             
-            # Validate first page structure
-            first_page = pages[0]
-            required_page_keys = ['page_number', 'text_content', 'text_blocks']
-            for key in required_page_keys:
-                if key not in first_page:
-                    self.print_error(f"{json_file.name}: Missing page key '{key}'")
-                    return False
+            if error:
+                log.append((self.print_error, f"{entry.name}: {error}"))
+                return False, log
             
-            # Validate summary
-            summary = content['summary']
-            required_summary_keys = ['total_text_length', 'total_images', 'total_tables']
-            for key in required_summary_keys:
-                if key not in summary:
-                    self.print_error(f"{json_file.name}: Missing summary key '{key}'")
-                    return False
+            doc_info = data['document_info']
+            summary = data['content']['summary']
             
             # Print validation details
             filename = doc_info['filename']
@@ -604,18 +949,18 @@ startxref
             images = summary['total_images']
             tables = summary['total_tables']
             
-            self.print_success(f"{json_file.name}: Valid JSON")
-            self.print_status(f"  File: {filename}, Pages: {total_pages}")
-            self.print_status(f"  Text length: {text_length}, Images: {images}, Tables: {tables}")
+            log.append((self.print_success, f"{entry.name}: Valid JSON"))
+            log.append((self.print_status, f"  File: {filename}, Pages: {total_pages}"))
+            log.append((self.print_status, f"  Text length: {text_length}, Images: {images}, Tables: {tables}"))
             
-            return True
+            return True, log
             
         except json.JSONDecodeError as e:
-            self.print_error(f"{json_file.name}: Invalid JSON format: {e}")
-            return False
+            log.append((self.print_error, f"{entry.name}: Invalid JSON format: {e}"))
+            return False, log
         except Exception as e:
-            self.print_error(f"{json_file.name}: Validation error: {e}")
-            return False
+            log.append((self.print_error, f"{entry.name}: Validation error: {e}"))
+            return False, log
 
     def check_performance(self):
         """Check performance requirements"""
@@ -645,22 +990,88 @@ startxref
             self.print_status("Note: This may be acceptable for test conditions")
             return False
 
+    def git_sha(self):
+        """Short hash of the checked-out commit, or 'unknown' outside a git checkout"""
+        try:
+            result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                    capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            return 'unknown'
+        return result.stdout.strip() if result.returncode == 0 else 'unknown'
+
+    def record_perf_history(self):
+        """Compare this run against recent runs, then append its timings to the history"""
+        if pa is None:
+            self.print_warning("pyarrow not installed, skipping performance history")
+            return
+        if not self.processing_times:
+            return
+        
+        max_time = max(self.processing_times)
+        if Path(PERF_HISTORY).exists():
+            # Each run's rows share one timestamp, so grouping on it recovers per-run maxima
+            runs = pq.read_table(PERF_HISTORY).group_by('timestamp').aggregate(
+                [('per_pdf_time', 'max')]).sort_by('timestamp')
+            recent = runs.column('per_pdf_time_max').to_pylist()[-PERF_HISTORY_RUNS:]
+            baseline = statistics.median(recent)
+            if max_time > PERF_REGRESSION_FACTOR * baseline:
+                self.print_warning(f"Performance regression: {max_time:.2f}s vs {baseline:.2f}s "
+                                   f"median of the last {len(recent)} runs")
+            else:
+                self.print_status(f"Maximum time in line with the {baseline:.2f}s median "
+                                  f"of the last {len(recent)} runs")
+        
+        # Page counts come from the final run's outputs, which are named after the fixtures
+        page_counts = {}
+        for pdf in set(self.processed_pdfs):
+            try:
+                output = load_json_file(Path("test_output") / f"{pdf.stem}.json")
+                page_counts[pdf] = output['document_info']['total_pages']
+            except (OSError, ValueError, KeyError):
+                page_counts[pdf] = None
+        
+        timestamp = datetime.now()
+        git_sha = self.git_sha()
+        rows = [
+            {
+                'timestamp': timestamp,
+                'git_sha': git_sha,
+                'per_pdf_time': per_pdf_time,
+                'pdf_size': pdf.stat().st_size,
+                'page_count': page_counts[pdf]
+            }
+            for pdf, per_pdf_time in zip(self.processed_pdfs, self.processing_times)
+        ]
+        
+        # An explicit schema keeps every file in the dataset readable as one table
+        schema = pa.schema([
+            ('timestamp', pa.timestamp('us')),
+            ('git_sha', pa.string()),
+            ('per_pdf_time', pa.float64()),
+            ('pdf_size', pa.int64()),
+            ('page_count', pa.int64())
+        ])
+        pq.write_to_dataset(pa.Table.from_pylist(rows, schema=schema), PERF_HISTORY)
+        self.print_status(f"Recorded {len(rows)} timings in {PERF_HISTORY}")
+
     def check_schema_compliance(self):
         """Check if output matches the expected schema"""
         self.print_header("SCHEMA COMPLIANCE CHECK")
         
-        schema_file = Path("sample_dataset/schema/output_schema.json")
+        schema_file = Path(SCHEMA_FILE)
         if not schema_file.exists():
             self.print_warning("Schema file not found, skipping detailed schema validation")
             return True
         
         try:
-            with open(schema_file) as f:
-                schema = json.load(f)
+            schema = load_json_file(schema_file)
             
             self.print_success("Schema file loaded successfully")
-            self.print_status("Detailed schema validation would require jsonschema library")
-            self.print_status("Basic structure validation passed in previous step")
+            if self.schema_validator is not None:
+                self.print_status("Every output file was validated against the compiled schema in the previous step")
+            else:
+                self.print_status("Detailed schema validation would require the fastjsonschema library")
+                self.print_status("Basic structure validation passed in previous step")
             
             self.test_results['schema_compliance'] = True
             return True
@@ -703,13 +1114,16 @@ startxref
 
     def cleanup(self):
         """Clean up test files"""
-        cleanup_dirs = ['test_input', 'test_output']
+        cleanup_dirs = ['test_input', 'test_output', 'test_stage']
         
-        print(f"\n{Colors.YELLOW}Cleanup Options:{Colors.RESET}")
-        print("1. Keep test files for manual review")
-        print("2. Clean up test files")
-        
-        choice = input("Enter choice (1 or 2): ").strip()
+        if self.cleanup_mode == 'interactive':
+            print(f"\n{Colors.YELLOW}Cleanup Options:{Colors.RESET}")
+            print("1. Keep test files for manual review")
+            print("2. Clean up test files")
+            
+            choice = input("Enter choice (1 or 2): ").strip()
+        else:
+            choice = '2' if self.cleanup_mode == 'clean' else '1'
         
         if choice == '2':
             for dir_name in cleanup_dirs:
@@ -735,16 +1149,28 @@ startxref
         print("• Verify schema compliance")
         print("• Generate final report")
         
-        input(f"\n{Colors.WHITE}Press Enter to start testing...{Colors.RESET}")
+        if self.cleanup_mode == 'interactive':
+            input(f"\n{Colors.WHITE}Press Enter to start testing...{Colors.RESET}")
         
         # Run all tests
         if not self.check_prerequisites():
             return False
         
-        if not self.create_test_pdfs():
+        # The Docker build runs while the test PDFs are created. Only its process is started
+        # here; the reader thread comes later in build_docker_image, so the PDF builder pool
+        # never forks a multi-threaded process
+        build = self.start_docker_build()
+        try:
+            pdfs_created = self.create_test_pdfs()
+        except BaseException:
+            self.stop_docker_build(build)
+            raise
+        
+        if not pdfs_created:
+            self.stop_docker_build(build)
             return False
         
-        if not self.build_docker_image():
+        if not self.build_docker_image(build):
             return False
         
         success, _ = self.test_docker_processing()
@@ -755,6 +1181,7 @@ startxref
             return False
         
         self.check_performance()
+        self.record_perf_history()
         self.check_schema_compliance()
         
         # Generate final report
@@ -767,7 +1194,23 @@ startxref
 
 def main():
     """Main function"""
-    tester = PDFSolutionTester()
+    parser = argparse.ArgumentParser(description="Test the PDF processing solution")
+    parser.add_argument('--verbose', action='store_true',
+                        help="report tool versions during the prerequisite check")
+    cleanup_group = parser.add_mutually_exclusive_group()
+    cleanup_group.add_argument('--cleanup', '--yes', dest='cleanup_mode', action='store_const', const='clean',
+                               help="run without prompting and remove test files afterwards")
+    cleanup_group.add_argument('--no-cleanup', dest='cleanup_mode', action='store_const', const='keep',
+                               help="run without prompting and keep test files for review")
+    cleanup_group.add_argument('--interactive', dest='cleanup_mode', action='store_const', const='interactive',
+                               help="prompt before testing and before cleanup (default)")
+    parser.set_defaults(cleanup_mode='interactive')
+    parser.add_argument('--force-amd64', action='store_true',
+                        help="pass --platform linux/amd64 to docker build even on amd64 hosts")
+    args = parser.parse_args()
+    
+    tester = PDFSolutionTester(verbose=args.verbose, cleanup_mode=args.cleanup_mode,
+                                force_amd64=args.force_amd64)
     
     try:
         success = tester.run_full_test()